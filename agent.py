@@ -10,10 +10,21 @@ from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_groq import ChatGroq  # Changed from langchain_openai
 from langchain_community.tools.tavily_search import TavilySearchResults
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import requests
+from functools import lru_cache
+from operator import itemgetter
+from cachetools import TTLCache
+import asyncio
+import groq
+import httpx
+import orjson
 import os
+import re
 import sys
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -29,6 +40,29 @@ try:
 except ImportError:
     ZoneInfo = None 
 
+try:
+    # Optional: semantic cache so near-duplicate web searches are also hits
+    from gptcache import Cache
+    from gptcache.adapter.api import init_similar_cache, get as gptcache_get, put as gptcache_put
+    from gptcache.config import Config
+except ImportError:
+    Cache = None
+
+# Shared HTTP client so connections to wttr.in are kept alive and reused
+# across tool calls instead of paying a fresh TCP + TLS handshake each time.
+# HTTP/2 lets parallel lookups (e.g. "compare Mumbai and Delhi") multiplex
+# over one connection. Connections belong to the event loop that opened
+# them, so callers should drive chat() from a single long-lived loop.
+_HTTP = httpx.AsyncClient(
+    http2=True,
+    timeout=10,
+    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+)
+
+async def aclose_http_client():
+    """Close the shared HTTP client (call on application shutdown)."""
+    await _HTTP.aclose()
+
 @tool
 def get_current_datetime() -> str:
     """Return current date & time in Indian Standard Time (IST)."""
@@ -40,11 +74,73 @@ def get_current_datetime() -> str:
             now = datetime.utcnow() + timedelta(hours=5, minutes=30)
         # Human friendly format, e.g., "2025-12-13 16:37:45 (IST)"
         return now.strftime("%Y-%m-%d %H:%M:%S (IST)")
-    except Exception as e:
-        return f"Error getting current time: {str(e)}"
+    except (KeyError, ValueError) as e:  # ZoneInfoNotFoundError is a KeyError
+        return f"Error getting current time: {e}"
+
+# Recent weather reports keyed on normalized city name. Weather changes slowly,
+# so repeat questions within a few minutes are answered without a network call.
+# (cachetools' @cached decorator does not understand coroutines, hence the
+# explicit lookup below.)
+_WEATHER_CACHE = TTLCache(maxsize=128, ttl=300)
+
+# Fields read from wttr.in's current_condition block, fetched in one call
+_WEATHER_FIELDS = itemgetter('weatherDesc', 'temp_C', 'FeelsLikeC', 'humidity')
+
+async def _fetch_weather(city: str) -> str:
+    """Fetch a weather report from wttr.in, reusing a cached one if fresh."""
+    key = city.strip().lower()
+    report = _WEATHER_CACHE.get(key)
+    if report is not None:
+        return report
+    
+    url = f"https://wttr.in/{city}?format=j1"
+    response = await _HTTP.get(url)
+    if response.status_code != 200:
+        return f"Could not fetch weather for {city}"
+    
+    data = orjson.loads(response.content)
+    current = data['current_condition'][0]
+    desc_list, temp_c, feels_like, humidity = _WEATHER_FIELDS(current)
+    weather_desc = desc_list[0]['value']
+    
+    report = f"Weather in {city}: {weather_desc}, Temperature: {temp_c}°C (feels like {feels_like}°C), Humidity: {humidity}%"
+    _WEATHER_CACHE[key] = report
+    return report
+
+# Speculative weather lookups started by chat() before the LLM has decided
+# which tools to call, keyed on normalized city. get_weather claims (pops) a
+# matching task instead of sending its own request; chat() cancels the rest.
+_WEATHER_PREFETCH = {}
+
+# "weather in Mumbai", "Weather for New York" -> city (extra words must be capitalized)
+_WEATHER_QUERY = re.compile(r"(?i:\bweather\s+(?:in|for|at))\s+([A-Za-z][\w'-]*(?:\s+[A-Z][\w'-]*)*)")
+
+def _prefetch_weather(user_input: str):
+    """Start lookups for cities the user asks the weather of; return their keys."""
+    started = []
+    for city in _WEATHER_QUERY.findall(user_input):
+        key = city.strip().lower()
+        if key in _WEATHER_CACHE or key in _WEATHER_PREFETCH:
+            continue
+        _WEATHER_PREFETCH[key] = asyncio.create_task(_fetch_weather(city))
+        started.append(key)
+    return started
+
+def _cancel_prefetch(keys):
+    """Drop speculative lookups the agent never used."""
+    for key in keys:
+        task = _WEATHER_PREFETCH.pop(key, None)
+        if task is None:
+            continue
+        if task.done():
+            # Successful results already sit in _WEATHER_CACHE; just consume errors
+            if not task.cancelled():
+                task.exception()
+        else:
+            task.cancel()
 
 @tool
-def get_weather(city: str) -> str:
+async def get_weather(city: str) -> str:
     """
     Get current weather for a city.
     
@@ -53,101 +149,273 @@ def get_weather(city: str) -> str:
     """
     # Using wttr.in API (free, no key required)
     try:
-        url = f"https://wttr.in/{city}?format=j1"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            current = data['current_condition'][0]
-            weather_desc = current['weatherDesc'][0]['value']
-            temp_c = current['temp_C']
-            feels_like = current['FeelsLikeC']
-            humidity = current['humidity']
-            
-            return f"Weather in {city}: {weather_desc}, Temperature: {temp_c}°C (feels like {feels_like}°C), Humidity: {humidity}%"
+        # Reuse the speculative lookup if chat() already started one for this city
+        task = _WEATHER_PREFETCH.pop(city.strip().lower(), None)
+        if task is not None:
+            return await task
+        return await _fetch_weather(city)
+    except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+        # Network failures, or a wttr.in payload that is not the JSON we expect
+        # (orjson.JSONDecodeError is a ValueError)
+        return f"Error getting weather: {e}"
+
+# Web search results are cached for 10 minutes. With gptcache installed the
+# lookup is by query embedding (similarity >= 0.9), so rephrased follow-ups
+# hit too; otherwise it falls back to an exact match on the normalized query.
+_SEARCH_TTL = 600
+_SEARCH_CACHE = TTLCache(maxsize=256, ttl=_SEARCH_TTL)
+
+# Neither cachetools caches nor gptcache's sqlite/faiss store are thread-safe,
+# and lookups arrive from worker threads and parallel tool calls at once
+_SEARCH_LOCK = threading.Lock()
+
+def _newest_fresh_entry(messages):
+    """
+    gptcache post-processing: of the candidates above the similarity
+    threshold, return the newest one that has not expired (or None).
+    
+    gptcache has no expiry of its own and its default post-processing picks
+    the best-scoring candidate, so an expired row scoring at least as high as
+    a fresh one would keep winning and every lookup would miss.
+    """
+    now = time.time()
+    newest, newest_ts = None, None
+    for message in messages:
+        ts = orjson.loads(message)["ts"]
+        if now - ts <= _SEARCH_TTL and (newest_ts is None or ts > newest_ts):
+            newest, newest_ts = message, ts
+    return newest
+
+@lru_cache(maxsize=1)
+def _get_semantic_cache():
+    cache = Cache()
+    init_similar_cache(
+        data_dir="./tavily_cache",
+        cache_obj=cache,
+        post_func=_newest_fresh_entry,
+        config=Config(similarity_threshold=0.9),
+    )
+    return cache
+
+def _search_cache_get(query: str):
+    with _SEARCH_LOCK:
+        if Cache is None:
+            return _SEARCH_CACHE.get(" ".join(query.lower().split()))
+        # Expired rows are skipped by _newest_fresh_entry
+        hit = gptcache_get(query, cache_obj=_get_semantic_cache())
+    if hit is None:
+        return None
+    return tuple(orjson.loads(hit)["result"])
+
+def _search_cache_put(query: str, result):
+    with _SEARCH_LOCK:
+        if Cache is None:
+            _SEARCH_CACHE[" ".join(query.lower().split())] = result
         else:
-            return f"Could not fetch weather for {city}"
-    except Exception as e:
-        return f"Error getting weather: {str(e)}"
+            entry = orjson.dumps({"ts": time.time(), "result": result}).decode()
+            gptcache_put(query, entry, cache_obj=_get_semantic_cache())
+
+async def _run_search_cache(func, *args):
+    """Call a search cache function, off the event loop only when it has to embed."""
+    if Cache is None:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+class CachedTavilySearchResults(TavilySearchResults):
+    """TavilySearchResults that answers repeated or near-duplicate queries from a cache."""
+    
+    def _run(self, query: str, run_manager=None):
+        cached = _search_cache_get(query)
+        if cached is not None:
+            return cached
+        result = super()._run(query, run_manager=run_manager)
+        # Failed searches come back as (error text, {}); don't cache those
+        if result[1]:
+            _search_cache_put(query, result)
+        return result
+    
+    async def _arun(self, query: str, run_manager=None):
+        cached = await _run_search_cache(_search_cache_get, query)
+        if cached is not None:
+            return cached
+        result = await super()._arun(query, run_manager=run_manager)
+        if result[1]:
+            await _run_search_cache(_search_cache_put, query, result)
+        return result
 
 # =============================================================================
 # STEP 2: Initialize Chat History (Short-term Memory)
 # =============================================================================
 
+MODEL_NAME = "openai/gpt-oss-120b"
+
+@lru_cache(maxsize=1)
+def _get_summary_llm():
+    """Small, deterministic LLM used only for summarizing old turns."""
+    return ChatGroq(
+        model_name=MODEL_NAME,
+        temperature=0,
+        max_tokens=256,
+        timeout=30,
+        max_retries=2,
+    )
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) without loading a tokenizer."""
+    return len(text) // 4 + 1
+
+async def _summarize(text: str) -> str:
+    response = await _get_summary_llm().ainvoke([
+        ("system", "Summarize this conversation excerpt in a few sentences. "
+                   "Keep names, places, facts and user preferences that may matter later."),
+        ("human", text),
+    ])
+    return response.content or ""
+
+class SummaryBufferMemory:
+    """
+    Short-term memory that keeps recent turns verbatim and rolls older turns
+    into summaries once the buffer goes over a token budget, so the prompt
+    stays bounded no matter how long the conversation runs.
+    
+    Summaries are append-only between compactions: they are placed before the
+    raw turns and are not rewritten while new turns are added, so the
+    [system prompt -> summaries -> older turns] part of the prompt stays
+    byte-identical and Groq's prompt cache can skip its prefill.
+    """
+    
+    def __init__(self, max_token_limit: int = 1500, max_summary_tokens: int = 500, compact_batch: int = 10):
+        self.max_token_limit = max_token_limit
+        self.max_summary_tokens = max_summary_tokens
+        self.compact_batch = compact_batch
+        self.summaries = []  # committed summaries, oldest first
+        # Recent turns as ("human" | "assistant", content). A deque so that
+        # compaction pops from the front in O(1) instead of copying the list.
+        # No maxlen: turns must be summarized before they leave, not evicted.
+        self.messages = deque()
+    
+    def load(self):
+        """Return the history as LangChain messages, summaries first."""
+        history = [
+            AIMessage(content=f"Summary of earlier conversation: {summary}")
+            for summary in self.summaries
+        ]
+        for role, content in self.messages:
+            if role == "human":
+                history.append(HumanMessage(content=content))
+            elif role == "assistant" and content:  # Only add non-empty messages
+                history.append(AIMessage(content=content))
+        return history
+    
+    async def save(self, user_input: str, output: str):
+        """Record one exchange, compacting older turns if over budget."""
+        self.messages.append(("human", user_input))
+        self.messages.append(("assistant", output))
+        
+        # Always keep at least the latest exchange verbatim
+        while self._buffer_tokens() > self.max_token_limit and len(self.messages) > 2:
+            await self._compact(min(self.compact_batch, len(self.messages) - 2))
+        
+        # Fold the summaries themselves once they outgrow their budget. This
+        # rewrites the prefix, but only after many compactions.
+        if len(self.summaries) > 1 and sum(map(_estimate_tokens, self.summaries)) > self.max_summary_tokens:
+            try:
+                folded = await _summarize("\n\n".join(self.summaries))
+                # An empty result must not wipe the committed summaries
+                if folded:
+                    self.summaries = [folded]
+            except Exception as e:
+                print(f"Error summarizing chat history: {str(e)}")
+    
+    def clear(self):
+        self.summaries.clear()
+        self.messages.clear()
+    
+    def _buffer_tokens(self) -> int:
+        return sum(_estimate_tokens(content) for _, content in self.messages)
+    
+    async def _compact(self, count: int):
+        oldest = [self.messages.popleft() for _ in range(count)]
+        try:
+            summary = await _summarize("\n".join(f"{role}: {content}" for role, content in oldest))
+            if summary:
+                self.summaries.append(summary)
+        except Exception as e:
+            # Losing the summary only costs context; the turns were over budget anyway
+            print(f"Error summarizing chat history: {str(e)}")
+
 # Initialize chat_history as a global variable
-chat_history = []
+chat_history = SummaryBufferMemory(max_token_limit=1500)
 
 # =============================================================================
 # STEP 3: Create the Agent
 # =============================================================================
 
-def create_agent():
-    """Initialize and return the agent executor."""
-    
+# Stateless custom tools. Tavily is built with the executor because it
+# validates TAVILY_API_KEY on construction.
+_LOCAL_TOOLS = [get_current_datetime, get_weather]
+
+# Prompt template with memory placeholder, compiled once at import
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a helpful AI assistant with access to tools for:
+        - Getting current date and time (use tool: get_current_datetime)
+        - Checking weather for any city (use tool: get_weather)
+        - Searching the web for information (use tool: tavily_search_results_json)
+        - Remembering chat history to provide context for future interactions
+        
+        Use these tools when needed to provide accurate and helpful responses.
+        Time and weather information should be current.
+        Use Indian Standard Time (IST) for all time-related queries.
+        Be conversational and remember the context from previous messages."""),
+    MessagesPlaceholder(variable_name="chat_history"),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+def _build_llm():
     # Initialize the Groq LLM with tool calling support
-    llm = ChatGroq(
-       model_name="openai/gpt-oss-120b",
+    return ChatGroq(
+        model_name=MODEL_NAME,
         temperature=0.7,
         max_tokens=1024,
         timeout=30,
         max_retries=2,
-        model_kwargs={
-            "tool_choice": "auto",
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "get_current_datetime",
-                        "description": "Get the current date and time."
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "get_weather",
-                        "description": "Get current weather for a city.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "city": {"type": "string", "description": "The city name"}
-                            },
-                            "required": ["city"]
-                        }
-                    }
-                }
-            ]
-        }
+        # Tool schemas are bound by create_tool_calling_agent; only ask Groq
+        # to emit several independent tool calls in a single response
+        model_kwargs={"parallel_tool_calls": True}
     )
+
+def _build_tavily():
+    # Open the semantic cache here, once, rather than racing to create it from
+    # the worker threads of the first concurrent searches
+    if Cache is not None:
+        _get_semantic_cache()
     
-    # Initialize Tavily search tool (LangChain built-in)
-    tavily_tool = TavilySearchResults(
-        max_results=3,
+    # Initialize Tavily search tool (LangChain built-in, wrapped with a cache).
+    # A few extra results per search let cached answers cover more follow-ups.
+    return CachedTavilySearchResults(
+        max_results=5,
         search_depth="basic",  # or "advanced" for more detailed results
         include_answer=True,
         include_raw_content=False
     )
+
+@lru_cache(maxsize=1)
+def _cached_executor():
+    """Build the agent executor. Cached, so this runs once per process."""
     
-    # Define all tools
-    tools = [get_current_datetime, get_weather, tavily_tool]
+    # The LLM and Tavily clients are independent and each does its own
+    # credential/config validation, so construct them side by side
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        llm_future = pool.submit(_build_llm)
+        tavily_future = pool.submit(_build_tavily)
+        llm, tavily_tool = llm_future.result(), tavily_future.result()
     
-    # Create prompt template with memory placeholder
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a helpful AI assistant with access to tools for:
-        - Getting current date and time (use tool: get_current_datetime)
-        - Checking weather for any city (use tool: get_weather)
-        - Searching the web for information (use tool: tavily_search_results_json)
-        - Remembering chat history to provide context for future interactions
-        
-        Use these tools when needed to provide accurate and helpful responses.
-        Time and weather information should be current.
-        Use Indian Standard Time (IST) for all time-related queries.
-        Be conversational and remember the context from previous messages."""),
-        MessagesPlaceholder(variable_name="chat_history"),
-        ("human", "{input}"),
-        MessagesPlaceholder(variable_name="agent_scratchpad"),
-    ])
+    # Define all tools
+    tools = [*_LOCAL_TOOLS, tavily_tool]
     
     # Create the agent
-    agent = create_tool_calling_agent(llm, tools, prompt)
+    agent = create_tool_calling_agent(llm, tools, _PROMPT)
     
     # Create agent executor
     agent_executor = AgentExecutor(
@@ -161,38 +429,46 @@ def create_agent():
     
     return agent_executor
 
+def create_agent():
+    """
+    Initialize and return the agent executor.
+    
+    The executor holds no per-conversation state (history is passed in on
+    each call), so one instance is built and shared by every caller.
+    """
+    return _cached_executor()
+
 # =============================================================================
 # STEP 4: Run the Agent with Memory
 # =============================================================================
 
-def chat(user_input: str, agent_executor):
+# Failures expected from an agent run: Groq API errors, HTTP transport errors
+# and output parsing errors. The tools report their own failures as tool
+# output, so they don't surface here. Anything else is a bug and is left to
+# the outer handler / caller.
+_AGENT_ERRORS = (groq.APIError, httpx.HTTPError, ValueError)
+
+async def chat(user_input: str, agent_executor, history=None):
     """
     Process user input and maintain chat history.
     
+    Runs the agent through its async path so that independent tool calls
+    emitted in a single model response are executed concurrently.
+    
     Args:
         user_input: The user's message
         agent_executor: The agent executor instance
+        history: SummaryBufferMemory for this conversation (defaults to the
+            module-level chat_history)
     
     Returns:
         The agent's response
     """
-    global chat_history
+    memory = chat_history if history is None else history
     
     try:
-        # Initialize chat_history if it's None
-        if chat_history is None:
-            chat_history = []
-            
-        # Convert chat history to proper message format for LangChain v1
-        formatted_history = []
-        for msg in chat_history:
-            if isinstance(msg, tuple) and len(msg) == 2:
-                role, content = msg
-                if role == "human":
-                    formatted_history.append(HumanMessage(content=content))
-                elif role == "assistant" and content:  # Only add non-empty messages
-                    if isinstance(content, str):
-                        formatted_history.append(AIMessage(content=content))
+        # Summaries plus recent turns, already in LangChain message format
+        formatted_history = memory.load()
         
         # Ensure the agent_executor is initialized
         if agent_executor is None:
@@ -204,9 +480,12 @@ def chat(user_input: str, agent_executor):
             "chat_history": formatted_history or []
         }
         
+        # Start likely weather lookups now so they overlap with the first LLM call
+        prefetched = _prefetch_weather(user_input)
+        
         # Run the agent with current chat history
         try:
-            response = agent_executor.invoke(input_data)
+            response = await agent_executor.ainvoke(input_data)
             
             # Get the output safely with more robust error handling
             if response is None:
@@ -224,17 +503,15 @@ def chat(user_input: str, agent_executor):
             if not output or not isinstance(output, str):
                 output = "I'm having trouble understanding. Could you rephrase your question?"
                 
-        except Exception as e:
-            output = f"I encountered an error: {str(e)}. Could you please rephrase your question?"
+        except _AGENT_ERRORS as e:
+            output = f"I encountered an error: {e}. Could you please rephrase your question?"
+        finally:
+            _cancel_prefetch(prefetched)
         
-        # Update chat history with the response
+        # Update chat history with the response (older turns are summarized
+        # once the buffer goes over its token budget)
         if output and output != 'No response generated':
-            chat_history.append(("human", user_input))
-            chat_history.append(("assistant", output))
-        
-        # Keep only last 10 exchanges (20 messages) to prevent context from growing too large
-        if len(chat_history) > 20:
-            chat_history = chat_history[-20:]
+            await memory.save(user_input, output)
         
         return output if output else "I'm not sure how to respond to that. Could you rephrase?"
         
@@ -243,6 +520,66 @@ def chat(user_input: str, agent_executor):
         print(error_msg)  # Log the error for debugging
         return "I'm sorry, I encountered an error processing your request. Please try again."
 
+async def chat_stream(user_input: str, agent_executor, history=None):
+    """
+    Like chat(), but yields the response token by token as Groq produces it.
+    
+    Uses AgentExecutor.astream_events, so callers can show the first tokens
+    while the tool loop is still running. The history is updated once the
+    run has finished.
+    
+    Args:
+        user_input: The user's message
+        agent_executor: The agent executor instance
+        history: SummaryBufferMemory for this conversation (defaults to the
+            module-level chat_history)
+    
+    Yields:
+        Text chunks of the agent's response
+    """
+    memory = chat_history if history is None else history
+    
+    # Ensure the agent_executor is initialized
+    if agent_executor is None:
+        agent_executor = create_agent()
+    
+    input_data = {
+        "input": user_input,
+        "chat_history": memory.load()
+    }
+    
+    # Start likely weather lookups now so they overlap with the first LLM call
+    prefetched = _prefetch_weather(user_input)
+    
+    output = None
+    streamed = []
+    try:
+        async for event in agent_executor.astream_events(input_data, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                token = event["data"]["chunk"].content
+                if token and isinstance(token, str):
+                    streamed.append(token)
+                    yield token
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # End of the top-level AgentExecutor run: its final answer
+                result = event["data"].get("output")
+                if isinstance(result, dict):
+                    output = result.get("output")
+    except _AGENT_ERRORS as e:
+        yield f"I encountered an error: {e}. Could you please rephrase your question?"
+        return
+    finally:
+        _cancel_prefetch(prefetched)
+    
+    # e.g. the executor stopped on its iteration limit without model tokens
+    if output and not streamed:
+        yield output
+    
+    output = output or "".join(streamed)
+    if output:
+        await memory.save(user_input, output)
+
 # =============================================================================
 # STEP 5: Main Execution
 # =============================================================================
@@ -285,6 +622,9 @@ if __name__ == "__main__":
     # Interactive chat loop
     print("Chat with the agent (type 'quit' to exit, 'history' to see chat history):\n")
     
+    # One event loop for the whole session keeps pooled connections usable
+    loop = asyncio.new_event_loop()
+    
     while True:
         try:
             user_input = input("You: ").strip()
@@ -301,10 +641,13 @@ if __name__ == "__main__":
         
         if user_input.lower() == 'history':
             print("\n--- Chat History ---")
-            if not chat_history:
+            if not chat_history.messages and not chat_history.summaries:
                 print("No chat history yet.")
             else:
-                for role, message in chat_history:
+                for summary in chat_history.summaries:
+                    preview = summary[:100] + "..." if len(summary) > 100 else summary
+                    print(f"summary: {preview}")
+                for role, message in chat_history.messages:
                     preview = message[:100] + "..." if len(message) > 100 else message
                     print(f"{role}: {preview}")
             print("--- End History ---\n")
@@ -316,12 +659,15 @@ if __name__ == "__main__":
             continue
         
         try:
-            response = chat(user_input, agent_executor)
+            response = loop.run_until_complete(chat(user_input, agent_executor))
             print(f"\n🤖 Agent: {response}\n")
         except KeyboardInterrupt:
             print("\n\nInterrupted. Type 'quit' to exit.\n")
         except Exception as e:
             print(f"\n❌ Error: {str(e)}\n")
+    
+    loop.run_until_complete(aclose_http_client())
+    loop.close()
 
 # =============================================================================
 # Installation & Example Usage:
@@ -329,7 +675,10 @@ if __name__ == "__main__":
 """
 INSTALLATION (LangChain v1 with Groq):
 --------------------------------------
-pip install langchain langchain-groq langchain-core langchain-community tavily-python requests python-dotenv
+pip install langchain langchain-groq langchain-core langchain-community tavily-python "httpx[http2]" orjson cachetools python-dotenv
+
+Optional, for semantic caching of web searches:
+pip install gptcache
 
 SETUP .ENV FILE:
 ----------------
@@ -380,7 +729,7 @@ KEY FEATURES:
 ✅ Loads API keys from .env file (using python-dotenv)
 ✅ LangChain v1 compatible imports
 ✅ Proper message formatting with HumanMessage/AIMessage
-✅ Simple array-based chat history (last 10 exchanges)
+✅ Summary-buffer chat history (recent turns verbatim, older turns summarized)
 ✅ Three useful tools: datetime, weather, web search
 ✅ Error handling and user-friendly messages
 ✅ Indian Standard Time (IST) support
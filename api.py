@@ -1,11 +1,13 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from agent import create_agent, chat
+from fastapi.responses import JSONResponse, StreamingResponse
+from agent import create_agent, chat, chat_stream, aclose_http_client, SummaryBufferMemory
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional
 from langchain_core.messages import HumanMessage, AIMessage
-import threading
+from cachetools import LRUCache
+import asyncio
+import json
 
 app = FastAPI(title="Agent API",
              description="API for the LangChain Agent",
@@ -18,20 +20,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the session ID returned by /chat/stream
+    expose_headers=["X-Session-Id"],
 )
 
-# Initialize the agent
+# Initialize the agent (stateless; history is passed in per session)
 agent_executor = create_agent()
 
-# Initialize chat history and lock
-chat_history: List[Tuple[str, str]] = []
-chat_lock = threading.Lock()
-
-# Ensure agent has memory attribute
-if not hasattr(agent_executor, 'memory'):
-    from langchain.memory import ConversationBufferMemory
-    agent_executor.memory = ConversationBufferMemory(return_messages=True)
-
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
@@ -40,16 +35,35 @@ class ChatResponse(BaseModel):
     response: str
     session_id: str
 
+@app.on_event("shutdown")
+async def shutdown():
+    await aclose_http_client()
+
 @app.get("/")
 async def root():
     return {"message": "Agent API is running. Use /chat to interact with the agent."}
 
-# In-memory session storage (in production, use a proper database)
-session_storage = {}
+# In-memory session storage (in production, use a proper database).
+# Bounded so a long-running server does not grow without limit: the least
+# recently used sessions are dropped once MAX_SESSIONS is reached. Each worker
+# process has its own map, so multi-worker deployments need sticky sessions
+# or an external store.
+MAX_SESSIONS = 10_000
+session_storage: Dict[str, SummaryBufferMemory] = LRUCache(maxsize=MAX_SESSIONS)
+
+# One lock per session: turns of the same session run in order, while
+# different sessions run concurrently on the event loop
+session_locks: Dict[str, asyncio.Lock] = LRUCache(maxsize=MAX_SESSIONS)
 
-def get_or_create_session(session_id: str) -> List[Tuple[str, str]]:
+def get_session_lock(session_id: str) -> asyncio.Lock:
+    lock = session_locks.get(session_id)
+    if lock is None:
+        lock = session_locks[session_id] = asyncio.Lock()
+    return lock
+
+def get_or_create_session(session_id: str) -> SummaryBufferMemory:
     if session_id not in session_storage:
-        session_storage[session_id] = []
+        session_storage[session_id] = SummaryBufferMemory()
     return session_storage[session_id]
 
 @app.post("/chat", response_model=ChatResponse)
@@ -62,39 +76,13 @@ async def chat_endpoint(chat_request: ChatRequest):
         else:
             session_id = chat_request.session_id
         
-        with chat_lock:
+        async with get_session_lock(session_id):
             # Get or create session
             session = get_or_create_session(session_id)
             
             try:
-                # Ensure agent has memory
-                if not hasattr(agent_executor, 'memory'):
-                    from langchain.memory import ConversationBufferMemory
-                    agent_executor.memory = ConversationBufferMemory(return_messages=True)
-                
-                # Process the chat message
-                response = chat(chat_request.message, agent_executor)
-                
-                # Get the updated history safely
-                updated_history = []
-                if hasattr(agent_executor, 'memory') and agent_executor.memory:
-                    if hasattr(agent_executor.memory, 'chat_memory'):
-                        updated_history = agent_executor.memory.chat_memory.messages
-                
-                # If no updated history, use the current session
-                if not updated_history:
-                    updated_history = session
-                
-                # Update session storage with the latest messages
-                # Convert messages to a serializable format
-                serialized_history = []
-                for msg in updated_history:
-                    if hasattr(msg, 'content'):
-                        role = 'assistant' if hasattr(msg, 'type') and msg.type == 'ai' else 'user'
-                        serialized_history.append((role, msg.content))
-                
-                if serialized_history:
-                    session_storage[session_id] = serialized_history
+                # Process the chat message against this session's history
+                response = await chat(chat_request.message, agent_executor, history=session)
                 
                 return {
                     "response": response,
@@ -115,6 +103,40 @@ async def chat_endpoint(chat_request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(chat_request: ChatRequest):
+    """
+    Stream the response as server-sent events: one JSON `{"token": ...}`
+    event per chunk, then `[DONE]`. The session ID is sent in the
+    X-Session-Id header.
+    """
+    # Generate a session ID if not provided
+    if not chat_request.session_id:
+        import uuid
+        session_id = str(uuid.uuid4())
+    else:
+        session_id = chat_request.session_id
+    
+    async def event_stream():
+        async with get_session_lock(session_id):
+            session = get_or_create_session(session_id)
+            try:
+                async for token in chat_stream(chat_request.message, agent_executor, history=session):
+                    yield f"data: {json.dumps({'token': token})}\n\n"
+            except Exception:
+                # Log the full error for debugging
+                import traceback
+                print(f"Error in chat processing: {traceback.format_exc()}")
+                error = "I'm sorry, I encountered an error processing your request. Please try again."
+                yield f"data: {json.dumps({'error': error})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id},
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
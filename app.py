@@ -1,22 +1,25 @@
 # streamlit_app.py
 """
 Streamlit Agent Chat — Input fixed at bottom, chat scrolls up (ChatGPT-like)
-Requires: agent.py with create_agent() and chat(user_input, agent_executor) -> str
+Requires: agent.py with create_agent(), SummaryBufferMemory and the async
+generator chat_stream(user_input, agent_executor, history) -> str chunks
 """
 
 import streamlit as st
+import asyncio
+import threading
 import uuid
 import time
 import traceback
 from typing import List, Dict
-import streamlit.components.v1 as components
 
 # === Import agent utilities ===
 try:
-    from agent import create_agent, chat as agent_chat
+    from agent import create_agent, chat_stream as agent_chat_stream, SummaryBufferMemory
 except Exception as imp_err:
     create_agent = None
-    agent_chat = None
+    agent_chat_stream = None
+    SummaryBufferMemory = None
     IMPORT_ERROR = imp_err
 else:
     IMPORT_ERROR = None
@@ -33,31 +36,7 @@ st.markdown(
     .title { font-size:22px; font-weight:700; }
     .subtitle { color:#7b8794; font-size:12px; }
 
-    /* Chatbox: fixed height and scrollable */
-    #chatbox {
-        border-radius: 12px;
-        padding: 18px;
-        background: linear-gradient(180deg, rgba(255,255,255,0.01), rgba(255,255,255,0.02));
-        box-shadow: 0 8px 28px rgba(2,6,23,0.06);
-        max-height: 68vh;          /* controls visible height */
-        overflow-y: auto;
-    }
-
-    /* message bubbles */
-    .msg-user { margin-left:auto; margin-bottom:12px; padding:12px 14px; border-radius:12px; background: linear-gradient(180deg,#dff3ff,#e9fbff); color:#052a3a; max-width:78%; box-shadow: 0 6px 18px rgba(2,6,23,0.06); word-wrap:break-word; }
-    .msg-assistant { margin-right:auto; margin-bottom:12px; padding:12px 14px; border-radius:12px; background: linear-gradient(180deg,#0f1724,#111827); color:#e6eef8; max-width:78%; box-shadow: 0 6px 18px rgba(2,6,23,0.12); word-wrap:break-word; }
-    .meta { font-size:11px; color:#98a0a6; margin-top:6px; }
-
-    /* Input area fixed visually at bottom of the page content */
-    .input-row { margin-top:12px; display:flex; gap:8px; align-items:center; }
-    .send-btn { padding:10px 14px; border-radius:12px; background:#0f62fe; color:white; border:none; cursor:pointer; }
     .small-muted { color:#98a0a6; font-size:12px; }
-
-    /* Responsive */
-    @media (max-width: 800px) {
-        #chatbox { max-height: 60vh; padding:12px; }
-        .msg-user, .msg-assistant { max-width:92%; }
-    }
     </style>
     """,
     unsafe_allow_html=True,
@@ -70,6 +49,38 @@ def get_agent_executor_cached():
         raise RuntimeError(f"agent.create_agent import failed: {IMPORT_ERROR}")
     return create_agent()
 
+# === Background event loop ===
+# The agent's HTTP client pools connections per event loop, so every rerun and
+# session submits its coroutines to one long-lived loop instead of asyncio.run.
+@st.cache_resource(show_spinner=False)
+def get_event_loop_cached():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop_cached()).result()
+
+def iter_async(agen):
+    """Consume an async generator on the background loop as a plain generator."""
+    async def next_item():
+        return await agen.__anext__()
+    try:
+        while True:
+            try:
+                yield run_async(next_item())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(agen.aclose())
+
+def clear_on_first(chunks, placeholder):
+    """Pass chunks through, clearing the "Thinking..." placeholder at the first one."""
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            placeholder.empty()
+        yield chunk
+
 def ensure_agent_ready():
     if st.session_state.get("agent_ready") and st.session_state.get("agent_executor"):
         return st.session_state["agent_executor"]
@@ -85,6 +96,11 @@ if "session_id" not in st.session_state:
 if "messages" not in st.session_state:
     st.session_state.messages = []  # list of {"role","content","ts"}
 
+# Per-browser-session agent memory (the agent module's global history would
+# otherwise be shared by every visitor)
+if "history" not in st.session_state and SummaryBufferMemory is not None:
+    st.session_state.history = SummaryBufferMemory()
+
 if "agent_ready" not in st.session_state:
     st.session_state.agent_ready = False
 
@@ -109,9 +125,6 @@ with status_col:
     else:
         st.info("Agent not initialized (initializing automatically)")
 
-# === Main chat container ===
-chatbox_placeholder = st.empty()
-
 # Initialize agent lazily (cold start)
 if not st.session_state.agent_ready:
     try:
@@ -121,116 +134,70 @@ if not st.session_state.agent_ready:
     except Exception:
         st.session_state.last_error = traceback.format_exc()
         st.error("Agent initialization failed. Open logs in the sidebar.")
-        # Render minimal chatbox and stop
-        chat_html = "<div id='chatbox'><div style='color:#e53e3e'>Agent init failed. Check logs.</div></div>"
-        chatbox_placeholder.markdown(chat_html, unsafe_allow_html=True)
+        with st.sidebar.expander("Last Error (traceback)"):
+            st.code(st.session_state.last_error)
         st.markdown("</div>", unsafe_allow_html=True)
         st.stop()
 
-# Function to render chat HTML (inside chatbox div)
-def render_chat_html(messages):
-    html_parts = ["<div id='chatbox'>"]
-    for msg in messages:
-        role = msg.get("role", "user")
-        content = msg.get("content", "")
-        ts = msg.get("ts", time.time())
-        ts_str = time.strftime("%H:%M", time.localtime(ts))
-        safe_content = content.replace("\n", "<br>")  # simple newline -> <br>
-        if role == "user":
-            html_parts.append(
-                f"<div style='display:flex; justify-content:flex-end;'><div class='msg-user'>{safe_content}<div class='meta'>You • {ts_str}</div></div></div>"
-            )
-        else:
-            html_parts.append(
-                f"<div style='display:flex; justify-content:flex-start;'><div class='msg-assistant'>{safe_content}<div class='meta'>Agent • {ts_str}</div></div></div>"
-            )
-    html_parts.append("</div>")
-    return "\n".join(html_parts)
-
-# Render current messages initially
-chatbox_placeholder.markdown(render_chat_html(st.session_state.messages), unsafe_allow_html=True)
-
-# === Input area: placed below the chatbox so it visually remains at bottom ===
-# We use a form to submit the user message (clears automatically)
-with st.form("chat_form", clear_on_submit=True):
-    user_input = st.text_area("Type your message:", key="user_input", height=120, placeholder="Ask me anything...")
-    submit = st.form_submit_button("Send")
-
-if submit and user_input and user_input.strip():
-    text = user_input.strip()
-    # Append user message immediately to session messages
-    st.session_state.messages.append({"role": "user", "content": text, "ts": time.time()})
+def render_message(msg):
+    """Render one chat message; earlier ones are drawn once per page run."""
+    role = msg.get("role", "user")
+    ts_str = time.strftime("%H:%M", time.localtime(msg.get("ts", time.time())))
+    with st.chat_message(role):
+        st.markdown(msg.get("content", ""))
+        st.caption(f"{'You' if role == 'user' else 'Agent'} • {ts_str}")
 
-    # Re-render chatbox with updated messages (user message shown)
-    chatbox_placeholder.markdown(render_chat_html(st.session_state.messages), unsafe_allow_html=True)
+# === Chat history ===
+for msg in st.session_state.messages:
+    render_message(msg)
 
-    # Create assistant placeholder in the chat history (so UI shows a bubble while thinking)
-    st.session_state.messages.append({"role": "assistant", "content": "Thinking...", "ts": time.time()})
-    chatbox_placeholder.markdown(render_chat_html(st.session_state.messages), unsafe_allow_html=True)
+# === Input area: st.chat_input stays pinned to the bottom of the page ===
+user_input = st.chat_input("Ask me anything...")
 
-    # Ensure agent ready
-    try:
-        agent_exec = st.session_state.get("agent_executor") or ensure_agent_ready()
-        start = time.time()
-        # Call your agent.chat synchronously
-        try:
-            response = agent_chat(text, agent_exec)
-            if response is None:
-                response = "I didn't receive a response. Please try again."
-            elif not isinstance(response, str):
-                try:
-                    response = str(response)
-                except Exception as e:
-                    response = f"Received an unexpected response format: {type(response).__name__}"
-        except Exception as e:
-            response = f"I encountered an error while processing your request: {str(e)}"
-
-        # Update assistant message in session_state with final text
-        # Find last assistant message index (should be the last element)
-        for i in range(len(st.session_state.messages) - 1, -1, -1):
-            if st.session_state.messages[i]["role"] == "assistant":
-                st.session_state.messages[i]["content"] = response
-                st.session_state.messages[i]["ts"] = time.time()
-                break
-        # Re-render chat with final assistant response
-        chatbox_placeholder.markdown(render_chat_html(st.session_state.messages), unsafe_allow_html=True)
-        elapsed = time.time() - start
-        # show small response time line below chatbox (optional)
-        st.markdown(f"<div style='text-align:right; color:#98a0a6; font-size:12px'>Response time: {elapsed:.2f}s</div>", unsafe_allow_html=True)
+if user_input and user_input.strip():
+    text = user_input.strip()
+    # Append and show only the new user message
+    user_msg = {"role": "user", "content": text, "ts": time.time()}
+    st.session_state.messages.append(user_msg)
+    render_message(user_msg)
 
-    except Exception:
-        tb = traceback.format_exc()
-        st.session_state.last_error = tb
-        # Replace assistant placeholder with friendly error
-        for i in range(len(st.session_state.messages) - 1, -1, -1):
-            if st.session_state.messages[i]["role"] == "assistant":
-                st.session_state.messages[i]["content"] = "⚠️ Agent failed to respond. Check logs."
-                st.session_state.messages[i]["ts"] = time.time()
-                break
-        chatbox_placeholder.markdown(render_chat_html(st.session_state.messages), unsafe_allow_html=True)
-        # Show error in sidebar
-        with st.sidebar.expander("Last Error (traceback)"):
-            st.code(tb)
-
-    # After updating chatbox, use a tiny JS snippet to scroll the chatbox to bottom
-    scroll_js = """
-    <script>
-    const cb = document.getElementById('chatbox');
-    if (cb) { cb.scrollTop = cb.scrollHeight; }
-    </script>
-    """
-    components.html(scroll_js, height=0)
+    # New assistant bubble; the reply is streamed into it token by token
+    with st.chat_message("assistant"):
+        thinking = st.empty()
+        thinking.markdown("Thinking...")
 
-# Ensure chat is scrolled to bottom on initial page load as well
-components.html(
-    """
-    <script>
-    const cb = document.getElementById('chatbox');
-    if (cb) { cb.scrollTop = cb.scrollHeight; }
-    </script>
-    """,
-    height=0,
-)
+        # Ensure agent ready
+        try:
+            agent_exec = st.session_state.get("agent_executor") or ensure_agent_ready()
+            start = time.time()
+            # agent.chat_stream is an async generator; drive it on the shared background loop
+            try:
+                tokens = iter_async(agent_chat_stream(text, agent_exec, history=st.session_state.history))
+                response = st.write_stream(clear_on_first(tokens, thinking))
+                if not response:
+                    response = "I didn't receive a response. Please try again."
+                    thinking.markdown(response)
+                elif not isinstance(response, str):
+                    response = "".join(str(part) for part in response)
+            except Exception as e:
+                response = f"I encountered an error while processing your request: {str(e)}"
+                thinking.markdown(response)
+
+            elapsed = time.time() - start
+            assistant_msg = {"role": "assistant", "content": response, "ts": time.time()}
+            st.caption(f"Agent • {time.strftime('%H:%M', time.localtime(assistant_msg['ts']))} • Response time: {elapsed:.2f}s")
+
+        except Exception:
+            tb = traceback.format_exc()
+            st.session_state.last_error = tb
+            # Replace assistant placeholder with friendly error
+            assistant_msg = {"role": "assistant", "content": "⚠️ Agent failed to respond. Check logs.", "ts": time.time()}
+            thinking.markdown(assistant_msg["content"])
+            # Show error in sidebar
+            with st.sidebar.expander("Last Error (traceback)"):
+                st.code(tb)
+
+    st.session_state.messages.append(assistant_msg)
 
 st.markdown("</div>", unsafe_allow_html=True)
 # Minimal footer